@@ -1,6 +1,18 @@
 import os
-from typing import List, Dict
-from openai import AsyncAzureOpenAI
+import asyncio
+import hashlib
+import io
+import logging
+import math
+import random
+import re
+import textwrap
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import List, Dict, Optional
+import httpx
+from openai import AsyncAzureOpenAI, RateLimitError
 from dotenv import load_dotenv
 
 from models import SearchResult, SearchSource
@@ -8,129 +20,675 @@ from models import SearchResult, SearchSource
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Frozen synthesis system prompt. Kept stable (no request-specific tokens) and
+# always sent verbatim as the first message so identical prefixes hit Azure's
+# server-side prompt cache.
+SYNTHESIS_SYSTEM_PROMPT = """
+You are an expert research assistant. Your task is to analyze and synthesize information from multiple search sources to provide a comprehensive, well-structured response to the user's query.
+
+Guidelines:
+1. Provide a clear, comprehensive answer based on the search results
+2. Cite sources when making specific claims
+3. Identify patterns and connections across different sources
+4. Highlight any conflicting information found
+5. Structure your response with clear sections if appropriate
+6. Be objective and factual
+7. If information is limited, acknowledge the limitations
+
+Format your response in a clear, readable manner with proper sections and bullet points where appropriate.
+"""
+
+_SYSTEM_PROMPT_CACHE_KEY = hashlib.sha256(SYNTHESIS_SYSTEM_PROMPT.encode()).hexdigest()
+
+# Process-wide raw SDK client shared by scripts and tests, built lazily
+_shared_client: Optional[AsyncAzureOpenAI] = None
+
+def get_client() -> AsyncAzureOpenAI:
+    """Return a process-wide AsyncAzureOpenAI client, creating it on first use.
+
+    Scripts and tests that previously constructed their own client per call
+    share one connection pool this way instead of paying a fresh TCP/TLS
+    handshake each time.
+    """
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = AsyncAzureOpenAI(
+            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-12-01-preview"),
+            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
+        )
+    return _shared_client
+
+class SemanticResponseCache:
+    """In-memory semantic cache for synthesized responses.
+
+    Stores (embedding, response) pairs and serves a cached response when a new
+    request's embedding is close enough (cosine similarity) to a stored one.
+    Entries expire after a TTL and the cache is bounded in size.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.95, ttl_seconds: int = 3600, max_entries: int = 128):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        # The lookup is a linear scan over 1536-d vectors on the event loop,
+        # so the cap doubles as a latency bound
+        self.max_entries = max_entries
+        # Each entry is (embedding, norm, response, expires_at); the norm is
+        # precomputed at put time so get() never recomputes stored norms
+        self._entries: list = []
+
+    @staticmethod
+    def _norm(vector: List[float]) -> float:
+        return math.sqrt(sum(x * x for x in vector))
+
+    def get(self, embedding: List[float]) -> Optional[str]:
+        """Return the cached response closest to embedding, if similar enough"""
+        now = time.time()
+        self._entries = [entry for entry in self._entries if entry[3] > now]
+
+        # Hoisted out of the loop: the query's own norm is scan-invariant
+        query_norm = self._norm(embedding)
+        if query_norm == 0:
+            return None
+
+        best_score = 0.0
+        best_response = None
+        for cached_embedding, cached_norm, response, _ in self._entries:
+            if cached_norm == 0:
+                continue
+            dot = sum(x * y for x, y in zip(embedding, cached_embedding))
+            score = dot / (query_norm * cached_norm)
+            if score > best_score:
+                best_score = score
+                best_response = response
+
+        if best_response is not None and best_score >= self.similarity_threshold:
+            return best_response
+        return None
+
+    def put(self, embedding: List[float], response: str):
+        """Store a response, evicting the oldest entry when full"""
+        if len(self._entries) >= self.max_entries:
+            self._entries.pop(0)
+        self._entries.append((embedding, self._norm(embedding), response, time.time() + self.ttl_seconds))
+
+class EmbeddingBatcher:
+    """Batches embedding requests across concurrent callers.
+
+    Accumulates texts for a short window (or until the batch fills) and issues
+    a single embeddings.create call for the whole batch, amortizing HTTP
+    overhead across concurrent requests.
+    """
+
+    def __init__(self, client, model: str, max_batch_size: int = 16, flush_interval: float = 0.02):
+        self.client = client
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        # Pending (text, future) pairs waiting for the next flush
+        self._pending: list = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def embed(self, text: str) -> List[float]:
+        """Queue a text for embedding and await its vector"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            # Flush on a detached task, never inline on this caller: the
+            # shared API call must survive this request being cancelled
+            asyncio.ensure_future(self._flush())
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._delayed_flush())
+
+        return await future
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.flush_interval)
+        await self._flush()
+
+    async def _flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+
+        try:
+            response = await self.client.embeddings.create(
+                model=self.model,
+                input=[text for text, _ in batch]
+            )
+            for (_, future), item in zip(batch, response.data):
+                if not future.done():
+                    future.set_result(item.embedding)
+        except BaseException as e:
+            # BaseException so even a cancelled flush task fails the batch
+            # futures instead of stranding their waiters forever
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+
+class SynthesisBatcher:
+    """Batches concurrent non-streaming synthesis prompts into one completion.
+
+    Collects user prompts for a short window (or until the batch fills) and
+    issues a single chat completion asking the model to answer each numbered
+    prompt independently, then splits the response back out to the waiting
+    futures. A batch of one is sent as a normal single completion, so the
+    batcher only changes behavior under concurrent load.
+    """
+
+    ANSWER_MARKER = re.compile(r"===\s*ANSWER\s+(\d+)\s*===")
+
+    def __init__(self, client, max_batch_size: int = 8, flush_interval: float = 0.05):
+        # client is the owning AzureOpenAIClient; completions go through its
+        # rate-limited _create_completion gate
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._pending: list = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def synthesize(self, user_prompt: str) -> str:
+        """Queue a synthesis prompt and await its completion text"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((user_prompt, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            # Flush on a detached task, never inline on this caller: the
+            # shared completion must survive this request being cancelled
+            asyncio.ensure_future(self._flush())
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._delayed_flush())
+
+        return await future
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.flush_interval)
+        await self._flush()
+
+    async def _single(self, user_prompt: str) -> str:
+        response = await self.client._create_completion(
+            messages=[
+                {"role": "system", "content": SYNTHESIS_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_completion_tokens=2000,
+            extra_headers={"prompt-cache-key": _SYSTEM_PROMPT_CACHE_KEY}
+        )
+        return response.choices[0].message.content
+
+    async def _flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+
+        try:
+            if len(batch) == 1:
+                prompt, future = batch[0]
+                if not future.done():
+                    future.set_result(await self._single(prompt))
+                return
+
+            numbered = "\n\n".join(
+                f"=== QUERY {i} ===\n{prompt}" for i, (prompt, _) in enumerate(batch, 1)
+            )
+            combined = (
+                "Answer each of the following numbered queries independently. "
+                "Begin each answer with a line containing exactly '=== ANSWER <number> ===' "
+                f"matching the query number.\n\n{numbered}"
+            )
+
+            response = await self.client._create_completion(
+                messages=[
+                    {"role": "system", "content": SYNTHESIS_SYSTEM_PROMPT},
+                    {"role": "user", "content": combined}
+                ],
+                max_completion_tokens=2000 * len(batch),
+                extra_headers={"prompt-cache-key": _SYSTEM_PROMPT_CACHE_KEY}
+            )
+            content = response.choices[0].message.content or ""
+
+            # Split on the answer markers; parts alternate [head, n1, a1, n2, a2...]
+            parts = self.ANSWER_MARKER.split(content)
+            answers = {
+                int(parts[i]): parts[i + 1].strip()
+                for i in range(1, len(parts) - 1, 2)
+            }
+
+            for i, (prompt, future) in enumerate(batch, 1):
+                if future.done():
+                    continue
+                answer = answers.get(i)
+                if answer:
+                    future.set_result(answer)
+                else:
+                    # Marker missing for this slot; fall back to a solo call
+                    logger.warning("Batched synthesis missing answer %d, retrying individually", i)
+                    future.set_result(await self._single(prompt))
+
+        except BaseException as e:
+            # BaseException so even a cancelled flush task fails the batch
+            # futures instead of stranding their waiters forever
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+
 class AzureOpenAIClient:
     """Azure OpenAI client for synthesizing search results"""
-    
+
+    # Character budgets for prompt assembly; LLM latency and cost scale with
+    # prompt length, so oversized snippets are trimmed before the API call
+    MAX_SNIPPET_CHARS = 500
+    MAX_TOTAL_CHARS = 12000
+
+    # Exact-match response cache in front of the semantic one: byte-identical
+    # repeats skip even the embedding lookup
+    EXACT_CACHE_TTL = 3600
+    EXACT_CACHE_MAX = 512
+
+
     def __init__(self):
-        import logging
-        logger = logging.getLogger(__name__)
-        
         api_key = os.getenv("AZURE_OPENAI_API_KEY")
         endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
         api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-12-01-preview")
         
-        logger.info(f"Initializing Azure OpenAI client with endpoint: {endpoint}")
-        logger.info(f"API key exists: {bool(api_key)}")
-        logger.info(f"API key length: {len(api_key) if api_key else 0}")
-        logger.info(f"API version: {api_version}")
+        logger.info("Initializing Azure OpenAI client with endpoint: %s", endpoint)
+        logger.info("API key exists: %s", bool(api_key))
+        logger.info("API key length: %d", len(api_key) if api_key else 0)
+        logger.info("API version: %s", api_version)
         
         if not api_key or not endpoint:
             logger.error("Missing Azure OpenAI credentials")
             raise ValueError("Azure OpenAI API key and endpoint are required")
         
         try:
+            # Shared HTTP client with a tuned keep-alive pool; HTTP/2 multiplexes
+            # concurrent completions over one TCP/TLS session
+            self.http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=200,
+                    max_keepalive_connections=100,
+                    keepalive_expiry=60
+                ),
+                http2=True,
+                timeout=httpx.Timeout(30.0, connect=5.0)
+            )
             self.client = AsyncAzureOpenAI(
                 api_version=api_version,
                 azure_endpoint=endpoint,
-                api_key=api_key
+                api_key=api_key,
+                http_client=self.http_client
             )
             self.deployment_name = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "o3-mini")
-            logger.info(f"Azure OpenAI client initialized successfully with deployment: {self.deployment_name}")
+            self.embedding_deployment = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "text-embedding-3-small")
+            self.fallback_deployment = os.getenv("AZURE_OPENAI_FALLBACK_DEPLOYMENT")
+            # Bound concurrent calls to Azure OpenAI so traffic bursts queue
+            # briefly instead of triggering hard 429 failures
+            self._sem = asyncio.Semaphore(int(os.getenv("AZURE_OPENAI_MAX_CONCURRENCY", "16")))
+            # Batch concurrent cache-lookup embeddings into single API calls
+            self._embedding_batcher = EmbeddingBatcher(self.client, self.embedding_deployment)
+            # Optional batching of concurrent non-streaming syntheses; off by
+            # default since multiplexed answers trade some quality for cost
+            self._synthesis_batcher = None
+            if os.getenv("AZURE_OPENAI_SYNTHESIS_BATCHING", "").lower() in ("1", "true", "yes"):
+                self._synthesis_batcher = SynthesisBatcher(self)
+            # Exact-hash cache: key -> (expires_at, synthesis)
+            self._exact_cache: "OrderedDict[str, tuple]" = OrderedDict()
+            # Semantic cache for syntheses, namespaced per deployment via this instance
+            self._synthesis_cache = SemanticResponseCache(
+                similarity_threshold=float(os.getenv("SYNTHESIS_CACHE_SIMILARITY", "0.95")),
+                ttl_seconds=int(os.getenv("SYNTHESIS_CACHE_TTL", "3600"))
+            )
+            logger.info("Azure OpenAI client initialized successfully with deployment: %s", self.deployment_name)
         except Exception as e:
-            logger.error(f"Failed to initialize Azure OpenAI client: {e}")
+            logger.error("Failed to initialize Azure OpenAI client: %s", e)
             raise
-    
-    async def synthesize_results(self, query: str, results: Dict[SearchSource, List[SearchResult]]) -> str:
-        """Synthesize search results using Azure OpenAI"""
-        
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"Starting AI synthesis for query: {query}")
-        
-        # Format results for the AI
-        formatted_results = self._format_results_for_ai(results)
-        
-        system_prompt = """
-        You are an expert research assistant. Your task is to analyze and synthesize information from multiple search sources to provide a comprehensive, well-structured response to the user's query.
-
-        Guidelines:
-        1. Provide a clear, comprehensive answer based on the search results
-        2. Cite sources when making specific claims
-        3. Identify patterns and connections across different sources
-        4. Highlight any conflicting information found
-        5. Structure your response with clear sections if appropriate
-        6. Be objective and factual
-        7. If information is limited, acknowledge the limitations
-        
-        Format your response in a clear, readable manner with proper sections and bullet points where appropriate.
+
+    async def close(self):
+        """Close the shared HTTP client on application shutdown"""
+        await self.http_client.aclose()
+
+    async def _create_completion(self, **kwargs):
+        """Issue a chat completion under the concurrency gate with retry/backoff
+
+        Retries rate-limited calls with exponential backoff plus jitter, and
+        routes a final attempt to the fallback deployment (if configured) when
+        429s persist.
         """
-        
-        user_prompt = f"""
+
+        async with self._sem:
+            last_error = None
+            for attempt in range(5):
+                try:
+                    return await self.client.chat.completions.create(
+                        model=self.deployment_name,
+                        **kwargs
+                    )
+                except RateLimitError as e:
+                    last_error = e
+                    delay = min(2 ** attempt, 30) + random.random()
+                    logger.warning("Azure OpenAI rate limited (attempt %d/5), retrying in %.1fs", attempt + 1, delay)
+                    await asyncio.sleep(delay)
+
+            if self.fallback_deployment:
+                logger.warning("Persistent rate limiting, routing to fallback deployment: %s", self.fallback_deployment)
+                return await self.client.chat.completions.create(
+                    model=self.fallback_deployment,
+                    **kwargs
+                )
+            raise last_error
+
+
+    async def _embed_for_cache(self, text: str) -> Optional[List[float]]:
+        """Get an embedding for semantic cache lookups, or None if unavailable"""
+
+        try:
+            return await self._embedding_batcher.embed(text)
+        except Exception as e:
+            logger.warning("Embedding for semantic cache failed: %s", e)
+            return None
+
+    def _exact_cache_key(self, query: str, formatted_results: str) -> str:
+        payload = f"{self.deployment_name}\x00{query}\x00{formatted_results}"
+        return hashlib.blake2b(payload.encode()).hexdigest()
+
+    def _exact_cache_get(self, key: str) -> Optional[str]:
+        """Return the cached synthesis for an identical prior request, if fresh"""
+        entry = self._exact_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, synthesis = entry
+        if expires_at <= time.time():
+            del self._exact_cache[key]
+            return None
+        self._exact_cache.move_to_end(key)
+        return synthesis
+
+    def _exact_cache_put(self, key: str, synthesis: str):
+        self._exact_cache[key] = (time.time() + self.EXACT_CACHE_TTL, synthesis)
+        self._exact_cache.move_to_end(key)
+        while len(self._exact_cache) > self.EXACT_CACHE_MAX:
+            self._exact_cache.popitem(last=False)
+
+    @staticmethod
+    def _build_synthesis_prompt(query: str, formatted_results: str) -> str:
+        """Build the user message for a synthesis request"""
+        return f"""
         Query: {query}
-        
+
         Search Results from Multiple Sources:
         {formatted_results}
-        
+
         Please analyze and synthesize this information to provide a comprehensive answer to the query. Include insights from the different sources and identify key themes or patterns.
         """
-        
+
+    async def synthesize_results_stream(self, query: str, results: Dict[SearchSource, List[SearchResult]], no_cache: bool = False, formatted_results: Optional[str] = None):
+        """Stream the synthesis for search results, yielding text chunks as they arrive"""
+
+        logger.info("Starting streaming AI synthesis for query: %s", query)
+
+        # Format results for the AI (unless the caller already did)
+        if formatted_results is None:
+            formatted_results = self._format_results_for_ai(results)
+
+        # Byte-identical repeats (reruns, retries) skip even the embedding call
+        exact_key = self._exact_cache_key(query, formatted_results)
+        if not no_cache:
+            cached_synthesis = self._exact_cache_get(exact_key)
+            if cached_synthesis is not None:
+                logger.info("Exact cache hit for query: %s", query)
+                yield cached_synthesis
+                return
+
+        # Check the semantic cache before paying for a full LLM round-trip
+        cache_embedding = None
+        if not no_cache:
+            cache_embedding = await self._embed_for_cache(f"{query}\n{formatted_results}")
+            if cache_embedding is not None:
+                cached_synthesis = self._synthesis_cache.get(cache_embedding)
+                if cached_synthesis is not None:
+                    logger.info("Semantic cache hit for query: %s", query)
+                    yield cached_synthesis
+                    return
+
+        user_prompt = self._build_synthesis_prompt(query, formatted_results)
+
+        logger.info("Making streaming Azure OpenAI API call with deployment: %s", self.deployment_name)
+
+        # o3-mini model doesn't support temperature parameter, only max_completion_tokens
+        response = await self._create_completion(
+            messages=[
+                {"role": "system", "content": SYNTHESIS_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_completion_tokens=2000,
+            stream=True,
+            extra_headers={"prompt-cache-key": _SYSTEM_PROMPT_CACHE_KEY}
+        )
+
+        collected = []
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                text = chunk.choices[0].delta.content
+                collected.append(text)
+                yield text
+
+        # Store in both caches for identical and near-duplicate follow-ups
+        if collected:
+            synthesis = "".join(collected)
+            self._exact_cache_put(exact_key, synthesis)
+            if cache_embedding is not None:
+                self._synthesis_cache.put(cache_embedding, synthesis)
+
+    async def synthesize_results(self, query: str, results: Dict[SearchSource, List[SearchResult]], no_cache: bool = False, formatted_results: Optional[str] = None) -> str:
+        """Synthesize search results using Azure OpenAI
+
+        Non-streaming wrapper around synthesize_results_stream that accumulates
+        the streamed chunks into a single string.
+        """
+
+        logger.info("Starting AI synthesis for query: %s", query)
+
         try:
-            logger.info(f"Making Azure OpenAI API call with deployment: {self.deployment_name}")
-            logger.info(f"Request parameters: model={self.deployment_name}, max_completion_tokens=2000")
-            
-            # o3-mini model doesn't support temperature parameter, only max_completion_tokens
-            response = await self.client.chat.completions.create(
-                model=self.deployment_name,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_completion_tokens=2000
-            )
-            
+            if self._synthesis_batcher is not None:
+                return await self._synthesize_batched(query, results, no_cache, formatted_results)
+
+            chunks = []
+            async for text in self.synthesize_results_stream(query, results, no_cache=no_cache, formatted_results=formatted_results):
+                chunks.append(text)
+
             logger.info("Azure OpenAI API call successful")
-            logger.info(f"Response received with {len(response.choices)} choices")
-            return response.choices[0].message.content
-            
+            return "".join(chunks)
+
         except Exception as e:
-            import traceback
-            logger.error(f"Azure OpenAI API call failed: {str(e)}")
-            logger.error(f"Error type: {type(e).__name__}")
-            logger.error(f"Full traceback: {traceback.format_exc()}")
+            logger.error("Azure OpenAI API call failed: %s", e)
+            logger.error("Error type: %s", type(e).__name__)
+            if logger.isEnabledFor(logging.DEBUG):
+                import traceback
+                logger.debug("Full traceback: %s", traceback.format_exc())
             
             # Check if it's an authentication error
             if "401" in str(e) or "unauthorized" in str(e).lower():
                 logger.error("Authentication error - checking credentials...")
-                logger.error(f"Using endpoint: {os.getenv('AZURE_OPENAI_ENDPOINT')}")
-                logger.error(f"Using deployment: {self.deployment_name}")
-                logger.error(f"Using API version: {os.getenv('AZURE_OPENAI_API_VERSION')}")
+                logger.error("Using endpoint: %s", os.getenv("AZURE_OPENAI_ENDPOINT"))
+                logger.error("Using deployment: %s", self.deployment_name)
+                logger.error("Using API version: %s", os.getenv("AZURE_OPENAI_API_VERSION"))
             
             return f"Error synthesizing results: {str(e)}"
     
+    async def _synthesize_batched(self, query: str, results: Dict[SearchSource, List[SearchResult]], no_cache: bool, formatted_results: Optional[str]) -> str:
+        """Non-streaming synthesis routed through the SynthesisBatcher"""
+        if formatted_results is None:
+            formatted_results = self._format_results_for_ai(results)
+
+        # Same exact + semantic cache front as the streaming path
+        exact_key = self._exact_cache_key(query, formatted_results)
+        cache_embedding = None
+        if not no_cache:
+            cached_synthesis = self._exact_cache_get(exact_key)
+            if cached_synthesis is not None:
+                logger.info("Exact cache hit for query: %s", query)
+                return cached_synthesis
+
+            cache_embedding = await self._embed_for_cache(f"{query}\n{formatted_results}")
+            if cache_embedding is not None:
+                cached_synthesis = self._synthesis_cache.get(cache_embedding)
+                if cached_synthesis is not None:
+                    logger.info("Semantic cache hit for query: %s", query)
+                    return cached_synthesis
+
+        synthesis = await self._synthesis_batcher.synthesize(
+            self._build_synthesis_prompt(query, formatted_results)
+        )
+
+        if synthesis:
+            self._exact_cache_put(exact_key, synthesis)
+            if cache_embedding is not None:
+                self._synthesis_cache.put(cache_embedding, synthesis)
+
+        return synthesis
+
+    async def synthesize_and_insights(self, query: str, results: Dict[SearchSource, List[SearchResult]], formatted_results: Optional[str] = None) -> Dict[str, object]:
+        """Generate synthesis and insights together in a single API call
+
+        Merges what would otherwise be two sequential chat completions into one
+        request that returns a JSON object with both outputs, halving round-trips
+        when both are needed.
+        """
+
+        import json
+        logger.info("Starting combined synthesis + insights for query: %s", query)
+
+        # Single pass over the result dict for both stats
+        total_results = 0
+        sources_with_results = []
+        for source, source_results in results.items():
+            count = len(source_results)
+            total_results += count
+            if count:
+                sources_with_results.append(source.value)
+
+        insights = {
+            "total_results": str(total_results),
+            "sources_with_results": ", ".join(sources_with_results),
+            "coverage": f"{len(sources_with_results)}/{len(results)} sources returned results"
+        }
+
+        if total_results == 0:
+            insights["ai_analysis"] = "No results found to analyze"
+            return {"synthesis": None, "insights": insights}
+
+        if formatted_results is None:
+            formatted_results = self._format_results_for_ai(results)
+
+        system_prompt = """
+        You are an expert research assistant. Analyze and synthesize information from multiple search sources.
+
+        Respond with a JSON object containing exactly two keys:
+        - "synthesis": a comprehensive, well-structured answer to the user's query based on the search results, citing sources for specific claims
+        - "insights": a brief analysis (under 200 words) of result quality and relevance, information diversity across sources, and notable patterns or themes
+        """
+
+        user_prompt = f"""
+        Query: {query}
+
+        Search Results from Multiple Sources:
+        {formatted_results}
+
+        Return the JSON object with the "synthesis" and "insights" keys as instructed.
+        """
+
+        try:
+            # o3-mini model doesn't support temperature parameter, only max_completion_tokens
+            response = await self._create_completion(
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                response_format={"type": "json_object"},
+                max_completion_tokens=2300
+            )
+
+            content = response.choices[0].message.content
+            try:
+                parsed = json.loads(content)
+            except (json.JSONDecodeError, TypeError):
+                logger.warning("Combined synthesis response was not valid JSON, using raw content")
+                insights["ai_analysis"] = "AI analysis unavailable"
+                return {"synthesis": content, "insights": insights}
+
+            insights["ai_analysis"] = parsed.get("insights", "AI analysis unavailable")
+            return {"synthesis": parsed.get("synthesis"), "insights": insights}
+
+        except Exception as e:
+            logger.error("Combined synthesis + insights call failed: %s", e)
+            insights["ai_analysis"] = f"Error generating insights: {str(e)}"
+            return {"synthesis": f"Error synthesizing results: {str(e)}", "insights": insights}
+
     def _format_results_for_ai(self, results: Dict[SearchSource, List[SearchResult]]) -> str:
-        """Format search results for AI processing"""
-        formatted = []
-        
+        """Format search results for AI processing, respecting character budgets"""
+        buf = io.StringIO()
+        total_chars = 0
+        truncated = False
+
         for source, source_results in results.items():
+            header = f"\n=== {source.value.upper()} RESULTS ===\n"
+            buf.write(header)
+            total_chars += len(header)
+
             if source_results:
-                formatted.append(f"\n=== {source.value.upper()} RESULTS ===")
-                for i, result in enumerate(source_results[:5], 1):  # Limit to top 5 per source
-                    formatted.append(f"\n{i}. Title: {result.title}")
-                    formatted.append(f"   URL: {result.url}")
-                    formatted.append(f"   Content: {result.snippet}")
+                for i, result in enumerate(islice(source_results, 5), 1):  # Limit to top 5 per source
+                    snippet = result.snippet
+                    if len(snippet) > self.MAX_SNIPPET_CHARS:
+                        shortened = textwrap.shorten(snippet, width=self.MAX_SNIPPET_CHARS, placeholder="...")
+                        # shorten returns just the placeholder when the text
+                        # has no whitespace to break on (CJK extracts, long
+                        # URLs); hard-slice instead of deleting the content
+                        if shortened == "...":
+                            shortened = snippet[:self.MAX_SNIPPET_CHARS - 3] + "..."
+                        snippet = shortened
+
+                    entry = f"\n{i}. Title: {result.title}\n   URL: {result.url}\n   Content: {snippet}\n"
                     if result.score:
-                        formatted.append(f"   Score: {result.score}")
+                        entry += f"   Score: {result.score}\n"
+
+                    if total_chars + len(entry) > self.MAX_TOTAL_CHARS:
+                        truncated = True
+                        break
+
+                    buf.write(entry)
+                    total_chars += len(entry)
             else:
-                formatted.append(f"\n=== {source.value.upper()} RESULTS ===")
-                formatted.append("No results found")
-        
-        return "\n".join(formatted)
+                buf.write("No results found\n")
+                total_chars += len("No results found\n")
+
+            if truncated:
+                break
+
+        if truncated:
+            buf.write("\n... (truncated)\n")
+
+        return buf.getvalue()
     
-    async def generate_search_insights(self, query: str, results: Dict[SearchSource, List[SearchResult]]) -> Dict[str, str]:
+    async def generate_search_insights(self, query: str, results: Dict[SearchSource, List[SearchResult]], formatted_results: Optional[str] = None) -> Dict[str, str]:
         """Generate insights about the search results"""
-        
-        total_results = sum(len(source_results) for source_results in results.values())
-        sources_with_results = [source.value for source, source_results in results.items() if source_results]
+
+        # Single pass over the result dict for both stats
+        total_results = 0
+        sources_with_results = []
+        for source, source_results in results.items():
+            count = len(source_results)
+            total_results += count
+            if count:
+                sources_with_results.append(source.value)
         
         insights = {
             "total_results": str(total_results),
@@ -140,6 +698,8 @@ class AzureOpenAIClient:
         
         # Generate AI-powered insights about result quality and relevance
         if total_results > 0:
+            if formatted_results is None:
+                formatted_results = self._format_results_for_ai(results)
             insight_prompt = f"""
             Analyze these search results for the query "{query}" and provide brief insights about:
             1. Result quality and relevance
@@ -147,14 +707,13 @@ class AzureOpenAIClient:
             3. Any notable patterns or themes
             
             Keep response under 200 words.
-            
-            {self._format_results_for_ai(results)}
+
+            {formatted_results}
             """
             
             try:
                 # o3-mini model doesn't support temperature parameter
-                response = await self.client.chat.completions.create(
-                    model=self.deployment_name,
+                response = await self._create_completion(
                     messages=[
                         {"role": "user", "content": insight_prompt}
                     ],
@@ -1,11 +1,16 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 import asyncio
-import json
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import Dict
 import logging
+import orjson
+from cachetools import TTLCache
 
 from models import SearchRequest, SearchResponse, SearchProgress, SearchSource, SearchResult
 from search_modules import ParallelSearchManager
@@ -15,10 +20,39 @@ from azure_openai_client import AzureOpenAIClient
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Size the loop's default executor explicitly; the stock
+    # min(32, cpu_count + 4) is too small for high-fan-out blocking I/O
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(
+        max_workers=int(os.getenv("SEARCH_THREAD_POOL", "64")),
+        thread_name_prefix="default"
+    ))
+
+    # Pre-warm the Azure OpenAI connection (TLS handshake, auth, HTTP/2
+    # setup) so the first user request doesn't pay those costs inline
+    try:
+        await openai_client.client.chat.completions.create(
+            model=openai_client.deployment_name,
+            messages=[{"role": "user", "content": "ping"}],
+            max_completion_tokens=1
+        )
+        logger.info("Azure OpenAI connection pre-warmed")
+    except Exception as e:
+        logger.warning(f"Azure OpenAI warm-up failed: {e}")
+
+    yield
+    # Close the shared connection pools on shutdown
+    await get_manager().aclose()
+    await openai_client.close()
+
 app = FastAPI(
     title="Deep Search API",
     description="Parallel search across multiple sources with AI synthesis",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -30,12 +64,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@lru_cache(maxsize=1)
+def get_manager() -> ParallelSearchManager:
+    """Process-level ParallelSearchManager singleton for DI via Depends"""
+    return ParallelSearchManager()
+
 # Initialize managers
-search_manager = ParallelSearchManager()
 openai_client = AzureOpenAIClient()
 
-# Store for tracking search progress
-search_progress: Dict[str, Dict[SearchSource, SearchProgress]] = {}
+# Pre-resolved source names, avoiding enum-by-value scans and try/except
+# on the streaming hot path
+_SOURCE_LOOKUP = {s.value: s for s in SearchSource}
+
+# Store for tracking search progress, keyed by (search_id, source).
+# Bounded with a TTL so abandoned or failed searches can't grow memory
+# without limit; stale entries simply expire.
+search_progress: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+search_progress_lock = asyncio.Lock()
 
 @app.get("/")
 async def root():
@@ -98,7 +143,7 @@ async def debug_azure_openai():
         }
 
 @app.post("/search", response_model=SearchResponse)
-async def search(request: SearchRequest):
+async def search(request: SearchRequest, search_manager: ParallelSearchManager = Depends(get_manager)):
     """Perform parallel search across multiple sources"""
     start_time = time.time()
     search_id = f"search_{int(start_time * 1000)}"
@@ -106,13 +151,13 @@ async def search(request: SearchRequest):
     logger.info(f"Starting search {search_id} for query: {request.query}")
     
     # Initialize progress tracking
-    search_progress[search_id] = {}
-    for source in request.sources:
-        search_progress[search_id][source] = SearchProgress(
-            source=source,
-            status="started"
-        )
-    
+    async with search_progress_lock:
+        for source in request.sources:
+            search_progress[(search_id, source)] = SearchProgress(
+                source=source,
+                status="started"
+            )
+
     try:
         # Execute parallel search
         results = await search_manager.search_parallel(
@@ -122,10 +167,12 @@ async def search(request: SearchRequest):
         )
         
         # Update progress
-        for source, source_results in results.items():
-            if source in search_progress[search_id]:
-                search_progress[search_id][source].status = "completed"
-                search_progress[search_id][source].results_count = len(source_results)
+        async with search_progress_lock:
+            for source, source_results in results.items():
+                progress = search_progress.get((search_id, source))
+                if progress is not None:
+                    progress.status = "completed"
+                    progress.results_count = len(source_results)
         
         # Convert results to response format
         formatted_results = {}
@@ -146,12 +193,10 @@ async def search(request: SearchRequest):
                 ai_synthesis = "AI synthesis unavailable"
         
         search_duration = time.time() - start_time
-        
-        # Clean up progress tracking
-        if search_id in search_progress:
-            del search_progress[search_id]
-        
-        response = SearchResponse(
+
+        # The nested SearchResult objects were just built by trusted code, so
+        # skip re-validating every field on the response path
+        response = SearchResponse.model_construct(
             query=request.query,
             results=formatted_results,
             ai_synthesis=ai_synthesis,
@@ -165,33 +210,41 @@ async def search(request: SearchRequest):
     except Exception as e:
         logger.error(f"Search {search_id} failed: {e}")
         # Update progress with error
-        for source in request.sources:
-            if source in search_progress[search_id]:
-                search_progress[search_id][source].status = "error"
-                search_progress[search_id][source].error_message = str(e)
-        
+        async with search_progress_lock:
+            for source in request.sources:
+                progress = search_progress.get((search_id, source))
+                if progress is not None:
+                    progress.status = "error"
+                    progress.error_message = str(e)
+
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 @app.get("/search/progress/{search_id}")
 async def get_search_progress(search_id: str):
     """Get progress of a running search"""
-    if search_id not in search_progress:
+    async with search_progress_lock:
+        progress = {
+            source: entry
+            for (entry_id, source), entry in search_progress.items()
+            if entry_id == search_id
+        }
+
+    if not progress:
         raise HTTPException(status_code=404, detail="Search not found")
-    
-    return search_progress[search_id]
+
+    return progress
 
 @app.get("/search/stream/{query}")
-async def stream_search(query: str, sources: str = "google,duckduckgo,wikipedia"):
+async def stream_search(query: str, sources: str = "google,duckduckgo,wikipedia", search_manager: ParallelSearchManager = Depends(get_manager)):
     """Stream search results as they come in"""
     
     # Parse sources
-    source_list = []
-    for source_name in sources.split(","):
-        try:
-            source_list.append(SearchSource(source_name.strip().lower()))
-        except ValueError:
-            continue
-    
+    source_list = [
+        source for source in (
+            _SOURCE_LOOKUP.get(name.strip().lower()) for name in sources.split(",")
+        ) if source is not None
+    ]
+
     if not source_list:
         source_list = [SearchSource.GOOGLE, SearchSource.DUCKDUCKGO, SearchSource.WIKIPEDIA]
     
@@ -199,32 +252,31 @@ async def stream_search(query: str, sources: str = "google,duckduckgo,wikipedia"
         search_id = f"stream_{int(time.time() * 1000)}"
         
         # Send initial message
-        yield f"data: {json.dumps({'type': 'start', 'search_id': search_id, 'query': query})}\n\n"
+        yield b"data: " + orjson.dumps({'type': 'start', 'search_id': search_id, 'query': query}) + b"\n\n"
         
         try:
-            # Execute searches and stream results
-            tasks = []
-            for source in source_list:
-                if source in search_manager.modules:
-                    task = asyncio.create_task(
-                        search_manager.modules[source].search(query, 5),
-                        name=f"search_{source.value}"
-                    )
-                    tasks.append((source, task))
-            
-            # Stream results as they complete
-            for source, task in tasks:
+            # Stream through the manager so this path shares its caches,
+            # circuit breakers, rate limits and single-flight coalescing;
+            # each source's frame is flushed the instant that source finishes
+            collected_results = {}
+            async for source, results in search_manager.search_parallel_stream(query, source_list, 5):
+                collected_results[source] = results
+                yield b"data: " + orjson.dumps({'type': 'results', 'source': source.value, 'results': [r.model_dump(mode='json') for r in results]}) + b"\n\n"
+
+            # Stream the AI synthesis token-by-token once all sources are done
+            if any(collected_results.values()):
                 try:
-                    results = await task
-                    yield f"data: {json.dumps({'type': 'results', 'source': source.value, 'results': [r.dict() for r in results]})}\n\n"
+                    async for text in openai_client.synthesize_results_stream(query, collected_results):
+                        yield b"data: " + orjson.dumps({'type': 'synthesis_delta', 'text': text}) + b"\n\n"
                 except Exception as e:
-                    yield f"data: {json.dumps({'type': 'error', 'source': source.value, 'error': str(e)})}\n\n"
-            
+                    logger.error(f"Streaming AI synthesis failed: {e}")
+                    yield b"data: " + orjson.dumps({'type': 'error', 'error': f'AI synthesis failed: {str(e)}'}) + b"\n\n"
+
             # Send completion message
-            yield f"data: {json.dumps({'type': 'complete'})}\n\n"
+            yield b"data: " + orjson.dumps({'type': 'complete'}) + b"\n\n"
             
         except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+            yield b"data: " + orjson.dumps({'type': 'error', 'error': str(e)}) + b"\n\n"
     
     return StreamingResponse(
         generate_stream(),
@@ -236,7 +288,7 @@ async def stream_search(query: str, sources: str = "google,duckduckgo,wikipedia"
     )
 
 @app.get("/sources")
-async def list_sources():
+async def list_sources(search_manager: ParallelSearchManager = Depends(get_manager)):
     """List available search sources"""
     return {
         "sources": [
@@ -250,8 +302,8 @@ async def list_sources():
     }
 
 @app.post("/analyze")
-async def analyze_results(request: SearchRequest):
-    """Get AI insights about search results without full synthesis"""
+async def analyze_results(request: SearchRequest, search_manager: ParallelSearchManager = Depends(get_manager)):
+    """Search and return an AI synthesis plus insights from one combined call"""
     try:
         # Execute search
         results = await search_manager.search_parallel(
@@ -260,18 +312,27 @@ async def analyze_results(request: SearchRequest):
             max_results_per_source=request.max_results_per_source
         )
         
-        # Generate insights
-        insights = await openai_client.generate_search_insights(request.query, results)
-        
+        # Generate synthesis and insights in a single API call
+        combined = await openai_client.synthesize_and_insights(request.query, results)
+
         return {
             "query": request.query,
-            "insights": insights,
+            "synthesis": combined["synthesis"],
+            "insights": combined["insights"],
             "total_results": sum(len(source_results) for source_results in results.values())
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+# The whole service is asyncio I/O-bound; uvloop's libuv-backed loop speeds
+# up the search fan-out and every Azure OpenAI call when it's installed
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,289 +1,506 @@
 import asyncio
+import hashlib
+import os
+import random
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import List, Optional
 from abc import ABC, abstractmethod
 import logging
 
+import httpx
+import orjson
+
+# Optional C-backed HTML parser; the regex scraping path is used as fallback
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# Optional distributed hot cache, shared across uvicorn workers when
+# REDIS_URL is configured
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
 # Import search libraries
 from duckduckgo_search import DDGS
-import wikipedia
 import praw
 
+from asyncio_throttle import Throttler
+
 from models import SearchResult, SearchSource
 
 logger = logging.getLogger(__name__)
 
+# Rotating user agents for Google scraping
+_USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0'
+]
+
+# Google domains tried concurrently when scraping
+_GOOGLE_DOMAINS = ['www.google.com', 'www.google.co.uk', 'www.google.ca']
+
+# Optional linear-time regex engine (google-re2). The scrape patterns are
+# backtracking-heavy DOTALL expressions over big HTML bodies; RE2's DFA is
+# immune to catastrophic backtracking. Falls back to stdlib re.
+try:
+    import re2 as _regex
+except ImportError:
+    _regex = re
+
+# Precompiled patterns for different Google result formats; compiled once at
+# import instead of on every scrape
+_SCRAPE_PATTERNS = [
+    _regex.compile(p, _regex.DOTALL) for p in (
+        r'<a href="/url\?q=([^&]+)&amp;sa=U.*?<h3.*?>(.*?)</h3>.*?<span.*?>(.*?)</span>',
+        r'<a.*?href="([^"]*)".*?<h3.*?>(.*?)</h3>.*?<div.*?>(.*?)</div>',
+        r'<div class="g">.*?<a href="([^"]*)".*?<h3.*?>(.*?)</h3>.*?<span.*?>(.*?)</span>'
+    )
+]
+
+# Strips residual HTML tags from scraped titles/snippets
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# Start of the main results region; everything before it (scripts, header,
+# navigation) is dead weight for the regex fallback
+_MAIN_REGION_RE = re.compile(r'<div id="(?:main|search|rso)"[^>]*>')
+
+def _canonical_query(query: str) -> str:
+    """Normalize a query for cache keys: lowercased, whitespace collapsed.
+
+    Near-duplicate queries ("Python asyncio", " python  asyncio ") then share
+    cache entries and single-flight futures; modules still receive the
+    original query text.
+    """
+    return " ".join(query.lower().split())
+
+async def _retry(coro_factory, attempts: int = 2, base: float = 0.1):
+    """Retry transient transport failures with exponential backoff plus jitter.
+
+    Only used for idempotent API calls; scraping is deliberately not retried
+    to avoid IP-block escalation.
+    """
+    last_error = None
+    for attempt in range(attempts):
+        try:
+            return await coro_factory()
+        except httpx.TransportError as e:
+            last_error = e
+            await asyncio.sleep(base * 2 ** attempt + random.uniform(0, base))
+    raise last_error
+
 class SearchModule(ABC):
     """Abstract base class for search modules"""
-    
+
     def __init__(self, source: SearchSource):
         self.source = source
-    
+        # Executor for blocking library calls; the manager injects its
+        # dedicated pool so sources don't contend on the loop's default one
+        self.executor: Optional[ThreadPoolExecutor] = None
+
     @abstractmethod
     async def search(self, query: str, max_results: int = 5) -> List[SearchResult]:
         """Perform search and return results"""
         pass
 
+    async def iter_search(self, query: str, max_results: int = 5):
+        """Yield results one at a time as an async iterator.
+
+        Default implementation drains search(); modules that can parse
+        incrementally may override to yield earlier.
+        """
+        for result in await self.search(query, max_results):
+            yield result
+
 class GoogleSearchModule(SearchModule):
     """Google search using multiple fallback strategies"""
-    
-    def __init__(self):
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         super().__init__(SearchSource.GOOGLE)
+        # API credentials are process-lifetime constants; read them once
+        # instead of hitting os.getenv on every search
+        self._google_key = os.getenv('GOOGLE_API_KEY')
+        self._google_cse = os.getenv('GOOGLE_CSE_ID')
+        self._serpapi_key = os.getenv('SERPAPI_KEY')
+        # Persistent client so repeated searches reuse pooled keep-alive
+        # connections; usually the manager-injected shared client
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(
+            timeout=10,
+            http2=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=100,
+                keepalive_expiry=30
+            )
+        )
+
+    async def aclose(self):
+        """Close the HTTP client on application shutdown, if this module owns it"""
+        if self._owns_client:
+            await self._client.aclose()
+
+    def _parse_google_html(self, html: str, query: str, max_results: int) -> List[SearchResult]:
+        """Parse Google result nodes with selectolax CSS selectors"""
+        parse_results = []
+
+        tree = HTMLParser(html)
+        for node in tree.css('div.g'):
+            anchor = node.css_first('a')
+            heading = node.css_first('h3')
+            if anchor is None or heading is None:
+                continue
+
+            url = anchor.attributes.get('href') or ''
+            if url.startswith('/url?q='):
+                url = url[len('/url?q='):].split('&', 1)[0]
+
+            title = heading.text(strip=True)[:100]
+            span = node.css_first('span')
+            snippet = (span.text(strip=True) if span is not None else '')[:200]
+
+            if url.startswith('http') and title:
+                parse_results.append(SearchResult.model_construct(
+                    source=self.source,
+                    title=title,
+                    url=url,
+                    snippet=snippet or f"Google search result for: {query}"
+                ))
+                if len(parse_results) >= max_results:
+                    break
+
+        return parse_results
+
+    async def _scrape_domain(self, domain: str, query: str, max_results: int) -> List[SearchResult]:
+        """Scrape one Google domain for results, returning [] on failure"""
+        from urllib.parse import quote_plus
+
+        headers = {
+            'User-Agent': random.choice(_USER_AGENTS),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            'Cache-Control': 'no-cache',
+            'Pragma': 'no-cache'
+        }
+
+        try:
+            search_url = f"https://{domain}/search?q={quote_plus(query)}&num={max_results}&hl=en"
+
+            response = await self._client.get(search_url, headers=headers, timeout=8)
+
+            if response.status_code != 200:
+                return []
+
+            html = response.text
+
+            # Prefer the C-backed DOM parser; regex over megabytes of HTML is
+            # an interpreter loop with backtracking risk
+            if HTMLParser is not None:
+                scrape_results = self._parse_google_html(html, query, max_results)
+                if scrape_results:
+                    logger.info(f"Web scraping successful from {domain}: {len(scrape_results)} results")
+                    return scrape_results
+
+            # Shrink the regex input to the main results region; Google pages
+            # run ~500KB while the results live in a ~20KB div, and the DOTALL
+            # patterns scan whatever we hand them
+            region = _MAIN_REGION_RE.search(html)
+            if region:
+                html = html[region.start():]
+
+            scrape_results = []
+
+            for pattern in _SCRAPE_PATTERNS:
+                matches = pattern.findall(html)
+
+                for match in matches:
+                    if len(scrape_results) >= max_results:
+                        break
+                    if len(match) >= 2:
+                        url = match[0]
+                        title = _TAG_RE.sub('', match[1])[:100]
+                        snippet = _TAG_RE.sub('', match[2] if len(match) > 2 else '')[:200]
+
+                        if url.startswith('http') and title:
+                            scrape_results.append(SearchResult.model_construct(
+                                source=self.source,
+                                title=title,
+                                url=url,
+                                snippet=snippet or f"Google search result for: {query}"
+                            ))
+
+                if scrape_results:
+                    logger.info(f"Web scraping successful from {domain}: {len(scrape_results)} results")
+                    return scrape_results
+
+            return []
+        except Exception as e:
+            logger.warning(f"Scraping failed for {domain}: {e}")
+            return []
     
+    # Strategy 1: Google Custom Search API (if credentials available)
+    async def _try_google_api(self, query: str, max_results: int) -> List[SearchResult]:
+        try:
+            api_url = "https://www.googleapis.com/customsearch/v1"
+            params = {
+                'key': self._google_key,
+                'cx': self._google_cse,
+                'q': query,
+                'num': min(max_results, 10)
+            }
+
+            response = await _retry(lambda: self._client.get(api_url, params=params))
+
+            if response.status_code == 200:
+                data = response.json()
+                api_results = []
+
+                for item in data.get('items', [])[:max_results]:
+                    api_results.append(SearchResult.model_construct(
+                        source=self.source,
+                        title=item.get('title', 'Google Result'),
+                        url=item.get('link', ''),
+                        snippet=item.get('snippet', 'No snippet available')
+                    ))
+
+                logger.info(f"Google API search successful: {len(api_results)} results")
+                return api_results
+        except Exception as e:
+            logger.warning(f"Google API search failed: {e}")
+        return []
+
+    # Strategy 2: SerpAPI (alternative Google search API)
+    async def _try_serpapi(self, query: str, max_results: int) -> List[SearchResult]:
+        try:
+            serpapi_url = "https://serpapi.com/search"
+            params = {
+                'api_key': self._serpapi_key,
+                'engine': 'google',
+                'q': query,
+                'num': max_results
+            }
+
+            response = await _retry(lambda: self._client.get(serpapi_url, params=params))
+
+            if response.status_code == 200:
+                data = response.json()
+                serp_results = []
+
+                for item in data.get('organic_results', [])[:max_results]:
+                    serp_results.append(SearchResult.model_construct(
+                        source=self.source,
+                        title=item.get('title', 'Google Result'),
+                        url=item.get('link', ''),
+                        snippet=item.get('snippet', 'No snippet available')
+                    ))
+
+                logger.info(f"SerpAPI search successful: {len(serp_results)} results")
+                return serp_results
+        except Exception as e:
+            logger.warning(f"SerpAPI search failed: {e}")
+        return []
+
+    # Strategy 3: Improved web scraping with rotating user agents.
+    # All domains are queried concurrently; the first one that parses
+    # into results wins and the rest are cancelled.
+    async def _try_web_scraping(self, query: str, max_results: int) -> List[SearchResult]:
+        try:
+            scrape_tasks = [
+                asyncio.create_task(self._scrape_domain(domain, query, max_results))
+                for domain in _GOOGLE_DOMAINS
+            ]
+
+            try:
+                pending = set(scrape_tasks)
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for finished in done:
+                        scrape_results = finished.result()
+                        if scrape_results:
+                            return scrape_results
+            finally:
+                for task in scrape_tasks:
+                    if not task.done():
+                        task.cancel()
+
+            return []
+
+        except Exception as e:
+            logger.warning(f"Web scraping approach failed: {e}")
+            return []
+
+    def _googlesearch_blocking(self, query: str, max_results: int) -> List[str]:
+        """Blocking googlesearch-library call, run on the executor"""
+        try:
+            from googlesearch import search as google_search
+            urls = list(google_search(query, num_results=max_results, sleep_interval=2, pause=1))[:max_results]
+
+            if urls:
+                logger.info(f"Googlesearch library successful: {len(urls)} results")
+            return urls
+        except Exception as e:
+            logger.warning(f"Googlesearch library failed: {e}")
+            return []
+
+    # Strategy 4: Fallback to original googlesearch library
+    async def _try_googlesearch_library(self, query: str, max_results: int) -> List[str]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, partial(self._googlesearch_blocking, query, max_results)
+        )
+
     async def search(self, query: str, max_results: int = 5) -> List[SearchResult]:
         try:
-            import os
-            import json
-            import httpx
-            from urllib.parse import quote_plus
-            
             results = []
-            loop = asyncio.get_event_loop()
-            
-            # Strategy 1: Google Custom Search API (if credentials available)
-            async def try_google_api():
-                google_api_key = os.getenv('GOOGLE_API_KEY')
-                google_cse_id = os.getenv('GOOGLE_CSE_ID')
-                
-                if google_api_key and google_cse_id:
-                    try:
-                        api_url = "https://www.googleapis.com/customsearch/v1"
-                        params = {
-                            'key': google_api_key,
-                            'cx': google_cse_id,
-                            'q': query,
-                            'num': min(max_results, 10)
-                        }
-                        
-                        async with httpx.AsyncClient(timeout=10) as client:
-                            response = await client.get(api_url, params=params)
-                            
-                        if response.status_code == 200:
-                            data = response.json()
-                            api_results = []
-                            
-                            for item in data.get('items', [])[:max_results]:
-                                api_results.append(SearchResult(
-                                    source=self.source,
-                                    title=item.get('title', 'Google Result'),
-                                    url=item.get('link', ''),
-                                    snippet=item.get('snippet', 'No snippet available')
-                                ))
-                            
-                            logger.info(f"Google API search successful: {len(api_results)} results")
-                            return api_results
-                    except Exception as e:
-                        logger.warning(f"Google API search failed: {e}")
-                return []
-            
-            # Strategy 2: SerpAPI (alternative Google search API)
-            async def try_serpapi():
-                serpapi_key = os.getenv('SERPAPI_KEY')
-                
-                if serpapi_key:
-                    try:
-                        serpapi_url = "https://serpapi.com/search"
-                        params = {
-                            'api_key': serpapi_key,
-                            'engine': 'google',
-                            'q': query,
-                            'num': max_results
-                        }
-                        
-                        async with httpx.AsyncClient(timeout=10) as client:
-                            response = await client.get(serpapi_url, params=params)
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            serp_results = []
-                            
-                            for item in data.get('organic_results', [])[:max_results]:
-                                serp_results.append(SearchResult(
-                                    source=self.source,
-                                    title=item.get('title', 'Google Result'),
-                                    url=item.get('link', ''),
-                                    snippet=item.get('snippet', 'No snippet available')
-                                ))
-                            
-                            logger.info(f"SerpAPI search successful: {len(serp_results)} results")
-                            return serp_results
-                    except Exception as e:
-                        logger.warning(f"SerpAPI search failed: {e}")
-                return []
-            
-            # Strategy 3: Improved web scraping with rotating user agents
-            def try_web_scraping():
-                try:
-                    import requests
-                    import random
-                    from urllib.parse import quote_plus
-                    import re
-                    import time
-                    
-                    user_agents = [
-                        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                        'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                        'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0'
-                    ]
-                    
-                    headers = {
-                        'User-Agent': random.choice(user_agents),
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                        'Accept-Language': 'en-US,en;q=0.5',
-                        'Accept-Encoding': 'gzip, deflate',
-                        'Connection': 'keep-alive',
-                        'Cache-Control': 'no-cache',
-                        'Pragma': 'no-cache'
-                    }
-                    
-                    # Try different Google domains
-                    domains = ['www.google.com', 'www.google.co.uk', 'www.google.ca']
-                    
-                    for domain in domains:
-                        try:
-                            search_url = f"https://{domain}/search?q={quote_plus(query)}&num={max_results}&hl=en"
-                            
-                            response = requests.get(search_url, headers=headers, timeout=8)
-                            
-                            if response.status_code == 200:
-                                html = response.text
-                                
-                                # Enhanced regex patterns for different Google result formats
-                                patterns = [
-                                    r'<a href="/url\?q=([^&]+)&amp;sa=U.*?<h3.*?>(.*?)</h3>.*?<span.*?>(.*?)</span>',
-                                    r'<a.*?href="([^"]*)".*?<h3.*?>(.*?)</h3>.*?<div.*?>(.*?)</div>',
-                                    r'<div class="g">.*?<a href="([^"]*)".*?<h3.*?>(.*?)</h3>.*?<span.*?>(.*?)</span>'
-                                ]
-                                
-                                scrape_results = []
-                                
-                                for pattern in patterns:
-                                    matches = re.findall(pattern, html, re.DOTALL)
-                                    
-                                    for i, match in enumerate(matches[:max_results]):
-                                        if len(match) >= 2:
-                                            url = match[0]
-                                            title = re.sub(r'<[^>]+>', '', match[1])[:100]
-                                            snippet = re.sub(r'<[^>]+>', '', match[2] if len(match) > 2 else '')[:200]
-                                            
-                                            if url.startswith('http') and title:
-                                                scrape_results.append({
-                                                    'title': title,
-                                                    'url': url,
-                                                    'snippet': snippet or f"Google search result for: {query}"
-                                                })
-                                    
-                                    if scrape_results:
-                                        logger.info(f"Web scraping successful from {domain}: {len(scrape_results)} results")
-                                        return scrape_results[:max_results]
-                            
-                            time.sleep(1)  # Rate limiting between domains
-                        except Exception as e:
-                            logger.warning(f"Scraping failed for {domain}: {e}")
-                            continue
-                    
-                    return []
-                    
-                except Exception as e:
-                    logger.warning(f"Web scraping approach failed: {e}")
-                    return []
-            
-            # Strategy 4: Fallback to original googlesearch library
-            def try_googlesearch_library():
-                try:
-                    from googlesearch import search as google_search
-                    urls = list(google_search(query, num_results=max_results, sleep_interval=2, pause=1))
-                    
-                    lib_results = []
-                    for i, url in enumerate(urls[:max_results]):
-                        lib_results.append({
-                            'title': f'Google Result {i+1}',
-                            'url': url,
-                            'snippet': f'Google search result for: {query}'
-                        })
-                    
-                    if lib_results:
-                        logger.info(f"Googlesearch library successful: {len(lib_results)} results")
-                    return lib_results
-                except Exception as e:
-                    logger.warning(f"Googlesearch library failed: {e}")
-                    return []
-            
-            # Try strategies in order of preference
-            search_data = await try_google_api()
-            
-            if not search_data:
-                search_data = await try_serpapi()
-            
-            if not search_data:
-                search_data = await loop.run_in_executor(None, try_web_scraping)
-            
-            if not search_data:
-                search_data = await loop.run_in_executor(None, try_googlesearch_library)
-            
-            # Convert results to SearchResult objects
+
+            # Try strategies in order of preference, skipping API strategies
+            # whose credentials are absent
+            strategies = []
+            if self._google_key and self._google_cse:
+                strategies.append(self._try_google_api)
+            if self._serpapi_key:
+                strategies.append(self._try_serpapi)
+            strategies.append(self._try_web_scraping)
+            strategies.append(self._try_googlesearch_library)
+
+            search_data = []
+            for strategy in strategies:
+                search_data = await strategy(query, max_results)
+                if search_data:
+                    break
+
+            # All strategies emit SearchResult directly except the
+            # googlesearch library, which only yields URLs
             for item in search_data:
+                if len(results) >= max_results:
+                    break
                 if isinstance(item, SearchResult):
                     results.append(item)
-                elif isinstance(item, dict):
-                    results.append(SearchResult(
-                        source=self.source,
-                        title=item.get('title', 'Google Result'),
-                        url=item.get('url', ''),
-                        snippet=item.get('snippet', f"Google search result for: {query}")
-                    ))
                 elif isinstance(item, str):  # URL only
-                    results.append(SearchResult(
+                    results.append(SearchResult.model_construct(
                         source=self.source,
                         title=f'Google Result {len(results)+1}',
                         url=item,
                         snippet=f"Google search result for: {query}"
                     ))
-            
+
             if results:
                 logger.info(f"Google search successful: {len(results)} results for '{query}'")
             else:
                 logger.warning(f"All Google search strategies failed for query: {query}")
-            
-            return results[:max_results]
-            
+
+            return results
+
         except Exception as e:
             logger.error(f"Google search error: {e}")
             return []
 
 class DuckDuckGoSearchModule(SearchModule):
-    """DuckDuckGo search using duckduckgo-search library with enhanced configuration"""
-    
-    def __init__(self):
+    """DuckDuckGo search via the HTML endpoint, falling back to the DDGS library"""
+
+    HTML_URL = "https://html.duckduckgo.com/html/"
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         super().__init__(SearchSource.DUCKDUCKGO)
-    
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(
+                max_keepalive_connections=10,
+                max_connections=50,
+                keepalive_expiry=30
+            )
+        )
+        # One DDGS instance for the fallback path so its HTTP client state
+        # (connection pool, TLS context) is reused across calls
+        self._ddgs = DDGS(
+            headers={'User-Agent': _USER_AGENTS[0]},
+            timeout=10
+        )
+
+    async def aclose(self):
+        """Close the HTTP client on application shutdown, if this module owns it"""
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def _search_html_endpoint(self, query: str, max_results: int) -> List[SearchResult]:
+        """Query DuckDuckGo's HTML endpoint directly on the event loop"""
+        if HTMLParser is None:
+            return []
+
+        response = await self._client.post(
+            self.HTML_URL,
+            data={'q': query},
+            headers={'User-Agent': _USER_AGENTS[0]}
+        )
+
+        if response.status_code != 200:
+            return []
+
+        results = []
+        tree = HTMLParser(response.text)
+        for node in tree.css('.result'):
+            anchor = node.css_first('.result__a')
+            if anchor is None:
+                continue
+
+            url = anchor.attributes.get('href') or ''
+            title = anchor.text(strip=True)
+            snippet_node = node.css_first('.result__snippet')
+            snippet = snippet_node.text(strip=True) if snippet_node is not None else 'No snippet available'
+
+            if url and title:
+                results.append(SearchResult.model_construct(
+                    source=self.source,
+                    title=title,
+                    url=url,
+                    snippet=snippet
+                ))
+                if len(results) >= max_results:
+                    break
+
+        return results
+
     async def search(self, query: str, max_results: int = 5) -> List[SearchResult]:
         try:
+            # Prefer the pure-asyncio HTML endpoint; no executor thread is
+            # tied up for the duration of the network roundtrip
+            try:
+                results = await self._search_html_endpoint(query, max_results)
+                if results:
+                    logger.info(f"DuckDuckGo HTML search successful: {len(results)} results for '{query}'")
+                    return results
+            except Exception as e:
+                logger.warning(f"DuckDuckGo HTML endpoint failed: {e}")
+
             results = []
-            loop = asyncio.get_event_loop()
-            
+            loop = asyncio.get_running_loop()
+
             # Enhanced DuckDuckGo search with better configuration
             def run_ddgs_search():
                 try:
-                    # Use DDGS with custom headers and settings
-                    ddgs = DDGS(
-                        headers={
-                            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                        },
-                        timeout=10
-                    )
-                    
-                    # Perform search with region and safesearch settings
-                    search_results = ddgs.text(
-                        query, 
+                    # Perform search with region and safesearch settings on
+                    # the shared DDGS instance
+                    search_results = self._ddgs.text(
+                        query,
                         max_results=max_results,
                         region='us-en',
                         safesearch='moderate',
                         timelimit=None
                     )
-                    
+
                     return list(search_results)
-                    
+
                 except Exception as e:
                     logger.warning(f"DuckDuckGo search attempt failed: {e}")
                     # Try with minimal configuration as fallback
@@ -294,7 +511,7 @@ class DuckDuckGoSearchModule(SearchModule):
                         logger.warning(f"DuckDuckGo fallback search also failed: {e2}")
                         return []
             
-            ddgs_results = await loop.run_in_executor(None, run_ddgs_search)
+            ddgs_results = await loop.run_in_executor(self.executor, run_ddgs_search)
             
             if not ddgs_results:
                 logger.warning("DuckDuckGo search returned no results")
@@ -302,7 +519,7 @@ class DuckDuckGoSearchModule(SearchModule):
             
             for item in ddgs_results:
                 if isinstance(item, dict):
-                    results.append(SearchResult(
+                    results.append(SearchResult.model_construct(
                         source=self.source,
                         title=item.get('title', 'No title'),
                         url=item.get('href', item.get('link', '')),
@@ -317,127 +534,466 @@ class DuckDuckGoSearchModule(SearchModule):
             return []
 
 class WikipediaSearchModule(SearchModule):
-    """Wikipedia search using wikipedia library"""
-    
-    def __init__(self):
+    """Wikipedia search using a single batched MediaWiki API call"""
+
+    API_URL = "https://en.wikipedia.org/w/api.php"
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         super().__init__(SearchSource.WIKIPEDIA)
-    
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(
+                max_keepalive_connections=10,
+                max_connections=50,
+                keepalive_expiry=30
+            )
+        )
+
+    async def aclose(self):
+        """Close the HTTP client on application shutdown, if this module owns it"""
+        if self._owns_client:
+            await self._client.aclose()
+
     async def search(self, query: str, max_results: int = 5) -> List[SearchResult]:
         try:
+            # One generator=search request returns titles, two-sentence
+            # extracts, and canonical URLs together, replacing the old
+            # 1 + 2*N blocking library calls. redirects=1 resolves
+            # redirects server-side; pageprops flags disambiguation pages so
+            # they can be filtered without extra calls. Fetch a couple of
+            # spares to keep max_results real articles after filtering.
+            params = {
+                'action': 'query',
+                'format': 'json',
+                'generator': 'search',
+                'gsrsearch': query,
+                'gsrlimit': max_results + 2,
+                'prop': 'pageprops|extracts|info',
+                'exintro': 1,
+                'explaintext': 1,
+                'exsentences': 2,
+                'inprop': 'url',
+                'redirects': 1
+            }
+
+            response = await self._client.get(self.API_URL, params=params)
+
+            if response.status_code != 200:
+                logger.warning(f"Wikipedia API returned status {response.status_code}")
+                return []
+
+            pages = response.json().get('query', {}).get('pages', {})
+
             results = []
-            loop = asyncio.get_event_loop()
-            
-            # Search Wikipedia
-            search_results = await loop.run_in_executor(
-                None,
-                lambda: wikipedia.search(query, results=max_results)
-            )
-            
-            for title in search_results[:max_results]:
-                try:
-                    # Get page summary
-                    summary = await loop.run_in_executor(
-                        None,
-                        lambda t=title: wikipedia.summary(t, sentences=2, auto_suggest=False)
-                    )
-                    
-                    page_url = await loop.run_in_executor(
-                        None,
-                        lambda t=title: wikipedia.page(t, auto_suggest=False).url
-                    )
-                    
-                    results.append(SearchResult(
-                        source=self.source,
-                        title=title,
-                        url=page_url,
-                        snippet=summary
-                    ))
-                except wikipedia.exceptions.DisambiguationError as e:
-                    # Take the first option from disambiguation
-                    if e.options:
-                        try:
-                            first_option = e.options[0]
-                            summary = await loop.run_in_executor(
-                                None,
-                                lambda: wikipedia.summary(first_option, sentences=2, auto_suggest=False)
-                            )
-                            page_url = await loop.run_in_executor(
-                                None,
-                                lambda: wikipedia.page(first_option, auto_suggest=False).url
-                            )
-                            results.append(SearchResult(
-                                source=self.source,
-                                title=first_option,
-                                url=page_url,
-                                snippet=summary
-                            ))
-                        except Exception:
-                            continue
-                except Exception:
+            # Pages come back keyed by pageid; 'index' preserves search order
+            for page in sorted(pages.values(), key=lambda p: p.get('index', 0)):
+                # Disambiguation pages have no useful extract; skip them
+                if 'disambiguation' in page.get('pageprops', {}):
                     continue
-            
+                results.append(SearchResult.model_construct(
+                    source=self.source,
+                    title=page.get('title', 'No title'),
+                    url=page.get('fullurl', ''),
+                    snippet=page.get('extract') or 'No summary available'
+                ))
+                if len(results) >= max_results:
+                    break
+
+            logger.info(f"Wikipedia search successful: {len(results)} results for '{query}'")
             return results
         except Exception as e:
             logger.error(f"Wikipedia search error: {e}")
             return []
 
+class CircuitBreaker:
+    """Fail-fast circuit breaker for one upstream source.
+
+    Closed: calls pass through; enough consecutive failures within the window
+    trip the breaker. Open: calls fail immediately until the cooldown elapses.
+    Half-open: a single probe call is allowed; success closes the breaker,
+    failure re-opens it.
+    """
+
+    FAILURE_THRESHOLD = 5
+    FAILURE_WINDOW = 30
+    OPEN_SECONDS = 60
+
+    def __init__(self):
+        self.failures: List[float] = []
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    def is_open(self) -> bool:
+        """Check whether calls should fail fast right now"""
+        if self.opened_at is None:
+            return False
+        if time.monotonic() - self.opened_at < self.OPEN_SECONDS:
+            return True
+        # Cooldown elapsed: let exactly one half-open probe through
+        if self.probing:
+            return True
+        self.probing = True
+        return False
+
+    def record_success(self):
+        self.failures.clear()
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        now = time.monotonic()
+        if self.opened_at is not None:
+            # Failed half-open probe: re-open for another cooldown
+            self.opened_at = now
+            self.probing = False
+            return
+        self.failures = [t for t in self.failures if now - t < self.FAILURE_WINDOW]
+        self.failures.append(now)
+        if len(self.failures) >= self.FAILURE_THRESHOLD:
+            self.opened_at = now
+
 class ParallelSearchManager:
     """Manager for coordinating parallel searches across multiple modules"""
-    
+
+    # In-memory result cache: entries live this long, the cache holds at most
+    # this many keys, and only searches slower than the floor are cached
+    CACHE_TTL = 300
+    CACHE_MAX_ENTRIES = 1024
+    CACHE_MIN_DURATION = 0.05
+
+    # TTL for the shared Redis layer
+    REDIS_TTL = 300
+
+    # Per-source concurrency bulkheads so one slow upstream can't exhaust
+    # the thread pool or overwhelm its provider under load
+    SEM_LIMITS = {
+        SearchSource.GOOGLE: 5,
+        SearchSource.DUCKDUCKGO: 8,
+        SearchSource.WIKIPEDIA: 10,
+    }
+
+    # Token-bucket rate limits per provider as (requests, period_seconds),
+    # roughly matching each upstream's tolerance
+    RATE_LIMITS = {
+        SearchSource.GOOGLE: (1, 2.0),
+        SearchSource.DUCKDUCKGO: (1, 1.0),
+        SearchSource.WIKIPEDIA: (10, 1.0),
+    }
+
+    # Sources this manager can serve; modules for them are built lazily
+    SOURCES = (SearchSource.GOOGLE, SearchSource.DUCKDUCKGO, SearchSource.WIKIPEDIA)
+
     def __init__(self):
-        self.modules = {}
-        self.setup_modules()
+        # One shared connector across all modules: keep-alive + DNS-cached
+        # connections are reused regardless of which module talks to a host
+        self._http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(15, connect=3),
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=128,
+                max_keepalive_connections=32,
+                keepalive_expiry=75
+            )
+        )
+        # Built on first access so unused deployments don't pay module
+        # construction (DDGS session, etc.) at import
+        self._modules = None
+        # LRU via OrderedDict: key -> (stored_at, results)
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = asyncio.Lock()
+        # Single-flight: in-progress searches keyed like the cache, so
+        # concurrent identical queries share one upstream call
+        self._inflight: dict = {}
+        # One breaker per source so a down upstream fails fast instead of
+        # burning the full timeout on every request
+        self._breakers = {source: CircuitBreaker() for source in self.SOURCES}
+        self._sems = {
+            source: asyncio.Semaphore(self.SEM_LIMITS.get(source, 8))
+            for source in self.SOURCES
+        }
+        # Token buckets smooth request rate per provider on top of the
+        # in-flight caps above, keeping us under upstream 429 thresholds
+        self._throttlers = {
+            source: Throttler(rate_limit=rate, period=period)
+            for source, (rate, period) in (
+                (s, self.RATE_LIMITS.get(s, (5, 1.0))) for s in self.SOURCES
+            )
+        }
+        # Dedicated pool for blocking search libraries, separate from the
+        # event loop's default executor
+        self._pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="search")
+        # Redis hot cache in front of the per-process one; the in-process
+        # cache is per-worker, so multi-worker deployments share hits here
+        self._redis = None
+        redis_url = os.getenv("REDIS_URL")
+        if redis_url and aioredis is not None:
+            try:
+                self._redis = aioredis.from_url(redis_url)
+                logger.info("Redis search cache enabled")
+            except Exception as e:
+                logger.warning(f"Redis search cache unavailable: {e}")
+
+    async def _cache_get(self, key):
+        """Return cached results for key if present and fresh, else None"""
+        async with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is None:
+                return None
+            stored_at, results = cached
+            if time.monotonic() - stored_at >= self.CACHE_TTL:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return list(results)
+
+    async def _cache_put(self, key, results):
+        """Store results for key, evicting the least recently used entries"""
+        async with self._cache_lock:
+            self._cache[key] = (time.monotonic(), list(results))
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _redis_key(src: SearchSource, query: str, max_results: int) -> str:
+        digest = hashlib.sha1(query.encode()).hexdigest()
+        return f"search:{src.value}:{digest}:{max_results}"
+
+    async def _redis_get(self, key: str):
+        """Fetch cached results from Redis, or None on miss/error"""
+        if self._redis is None:
+            return None
+        try:
+            raw = await self._redis.get(key)
+        except Exception as e:
+            logger.warning(f"Redis cache read failed: {e}")
+            return None
+        if raw is None:
+            return None
+        return [SearchResult(**item) for item in orjson.loads(raw)]
+
+    async def _redis_put(self, key: str, results):
+        """Store results in Redis with TTL, ignoring errors"""
+        if self._redis is None:
+            return
+        try:
+            payload = orjson.dumps([r.model_dump(mode="json") for r in results])
+            await self._redis.setex(key, self.REDIS_TTL, payload)
+        except Exception as e:
+            logger.warning(f"Redis cache write failed: {e}")
     
+    @property
+    def modules(self):
+        """Search modules keyed by source, built on first access"""
+        if self._modules is None:
+            self.setup_modules()
+        return self._modules
+
     def setup_modules(self):
-        """Initialize search modules"""
-        self.modules[SearchSource.GOOGLE] = GoogleSearchModule()
-        self.modules[SearchSource.DUCKDUCKGO] = DuckDuckGoSearchModule()
-        self.modules[SearchSource.WIKIPEDIA] = WikipediaSearchModule()
+        """Initialize search modules with the shared HTTP client"""
+        self._modules = {
+            SearchSource.GOOGLE: GoogleSearchModule(client=self._http_client),
+            SearchSource.DUCKDUCKGO: DuckDuckGoSearchModule(client=self._http_client),
+            SearchSource.WIKIPEDIA: WikipediaSearchModule(client=self._http_client),
+        }
+        for module in self._modules.values():
+            module.executor = self._pool
+
+    async def aclose(self):
+        """Close module-held HTTP clients and the thread pool on shutdown"""
+        if self._modules is not None:
+            for module in self._modules.values():
+                close = getattr(module, "aclose", None)
+                if close is not None:
+                    await close()
+        await self._http_client.aclose()
+        self._pool.shutdown(wait=False)
     
-    async def search_parallel(self, query: str, sources: List[SearchSource], max_results_per_source: int = 5) -> dict:
-        """Execute parallel searches across selected sources with timeout handling"""
-        tasks = []
-        
-        for source in sources:
-            if source in self.modules:
-                # Wrap each search with timeout
-                async def search_with_timeout(src, mod):
-                    try:
-                        # Set timeout per source (Google might need more time due to sleep intervals)
-                        timeout = 30 if src == SearchSource.GOOGLE else 15
-                        return await asyncio.wait_for(
-                            mod.search(query, max_results_per_source),
-                            timeout=timeout
-                        )
-                    except asyncio.TimeoutError:
-                        logger.warning(f"Search timeout for {src.value} after {timeout}s")
-                        return []
-                    except Exception as e:
-                        logger.error(f"Search error for {src.value}: {e}")
-                        return []
-                
-                task = asyncio.create_task(
-                    search_with_timeout(source, self.modules[source]),
-                    name=f"search_{source.value}"
+    async def search_batched(self, queries: List[str], sources: List[SearchSource], max_results_per_source: int = 5) -> dict:
+        """Execute searches for a burst of queries in one concurrent fan-out.
+
+        Duplicate query strings are collapsed before dispatch, so a batch of
+        near-simultaneous identical queries costs one upstream fan-out per
+        unique query. Returns {query: {source: results}}.
+        """
+        unique_queries = list(dict.fromkeys(queries))
+
+        outcomes = await asyncio.gather(*(
+            self.search_parallel(q, sources, max_results_per_source)
+            for q in unique_queries
+        ))
+
+        return dict(zip(unique_queries, outcomes))
+
+    async def _search_with_timeout(self, src: SearchSource, mod: SearchModule, query: str, max_results_per_source: int) -> List[SearchResult]:
+        """Run one source's search behind cache, breaker, single-flight and timeout"""
+        canonical = _canonical_query(query)
+        key = (src, canonical, max_results_per_source)
+
+        cached_results = await self._cache_get(key)
+        if cached_results is not None:
+            logger.info(f"Cache hit for {src.value} query: {query}")
+            return cached_results
+
+        # Shared Redis layer: another worker may have done this search already
+        redis_key = self._redis_key(src, canonical, max_results_per_source)
+        redis_results = await self._redis_get(redis_key)
+        if redis_results is not None:
+            logger.info(f"Redis cache hit for {src.value} query: {query}")
+            await self._cache_put(key, redis_results)
+            return redis_results
+
+        breaker = self._breakers[src]
+        if breaker.is_open():
+            logger.warning(f"Circuit open for {src.value}, failing fast")
+            return []
+
+        # Single-flight: all callers for this key share one manager-owned
+        # dispatch task, so cancelling any one caller (e.g. an SSE client
+        # disconnecting) can't resolve the shared future with a bogus []
+        entry = self._inflight.get(key)
+        if entry is None:
+            future = asyncio.get_running_loop().create_future()
+            entry = {
+                "future": future,
+                "waiters": 0,
+                "worker": asyncio.create_task(
+                    self._dispatch_search(src, mod, query, max_results_per_source, key, redis_key, future),
+                    name=f"dispatch_{src.value}"
                 )
-                tasks.append((source, task))
-        
-        results = {}
-        
-        # Execute all searches in parallel
-        completed_tasks = await asyncio.gather(*[task for _, task in tasks], return_exceptions=True)
-        
-        for i, (source, task) in enumerate(tasks):
+            }
+            self._inflight[key] = entry
+        else:
+            logger.info(f"Joining in-flight {src.value} search for query: {query}")
+
+        entry["waiters"] += 1
+        try:
+            # shield: this caller's cancellation must not cancel the shared work
+            return list(await asyncio.shield(entry["future"]))
+        except asyncio.CancelledError:
+            if entry["waiters"] <= 1 and not entry["future"].done():
+                # Last waiter is leaving; stop the upstream work and drop the
+                # entry so late arrivals re-dispatch instead of joining a
+                # doomed future
+                entry["worker"].cancel()
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+            raise
+        finally:
+            entry["waiters"] -= 1
+
+    async def _dispatch_search(self, src: SearchSource, mod: SearchModule, query: str, max_results_per_source: int, key, redis_key: str, future: asyncio.Future):
+        """Run the breaker/timeout-guarded upstream search for one key.
+
+        Executes in a manager-owned task so the single-flight future resolves
+        with the real outcome even if the caller that dispatched it is
+        cancelled mid-flight; it is only cancelled once no waiters remain.
+        """
+        breaker = self._breakers[src]
+        results = []
+        try:
+            # Set timeout per source (Google might need more time due to sleep intervals)
+            timeout = 30 if src == SearchSource.GOOGLE else 15
+            started = time.monotonic()
+            # One deadline spans queue wait (semaphore + token bucket) and the
+            # search itself, so rate-limit backlog can't hold a request past
+            # its per-source budget
+            async with asyncio.timeout(timeout):
+                async with self._sems[src], self._throttlers[src]:
+                    results = await mod.search(query, max_results_per_source)
+            breaker.record_success()
+            # Only cache searches that were worth skipping
+            if results and time.monotonic() - started > self.CACHE_MIN_DURATION:
+                await self._cache_put(key, results)
+                await self._redis_put(redis_key, results)
+        except asyncio.TimeoutError:
+            logger.warning(f"Search timeout for {src.value} after {timeout}s")
+            breaker.record_failure()
+        except asyncio.CancelledError:
+            # Abandoned by every waiter; leave the future unresolved rather
+            # than handing out an empty result
+            future.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"Search error for {src.value}: {e}")
+            breaker.record_failure()
+        finally:
+            entry = self._inflight.get(key)
+            if entry is not None and entry["future"] is future:
+                del self._inflight[key]
+            if not future.done():
+                future.set_result(results)
+
+    async def search_parallel_stream(self, query: str, sources: List[SearchSource], max_results_per_source: int = 5):
+        """Execute searches and yield (source, results) as each source finishes
+
+        Callers streaming to a client can render fast sources immediately
+        instead of waiting for the slowest one.
+        """
+        async def labeled(src, task):
+            return src, await task
+
+        source_list = [source for source in sources if source in self.modules]
+
+        canonical = _canonical_query(query)
+
+        # Batch the Redis lookups for every requested source into one MGET
+        # round-trip instead of one GET per source
+        redis_hits = {}
+        if self._redis is not None and source_list:
+            keys = [self._redis_key(source, canonical, max_results_per_source) for source in source_list]
             try:
-                if isinstance(completed_tasks[i], Exception):
-                    logger.error(f"Search failed for {source}: {completed_tasks[i]}")
-                    results[source] = []
-                else:
-                    search_results = completed_tasks[i]
-                    results[source] = search_results if search_results else []
-                    logger.info(f"{source.value} search completed: {len(results[source])} results")
+                raw_values = await self._redis.mget(keys)
+                for source, raw in zip(source_list, raw_values):
+                    if raw is not None:
+                        redis_hits[source] = [SearchResult(**item) for item in orjson.loads(raw)]
             except Exception as e:
-                logger.error(f"Error processing results for {source}: {e}")
-                results[source] = []
-        
+                logger.warning(f"Redis batch read failed: {e}")
+
+        for source, cached_results in redis_hits.items():
+            logger.info(f"Redis cache hit for {source.value} query: {query}")
+            await self._cache_put((source, canonical, max_results_per_source), cached_results)
+            yield source, cached_results
+
+        tasks = [
+            (source, asyncio.create_task(
+                self._search_with_timeout(source, self.modules[source], query, max_results_per_source),
+                name=f"search_{source.value}"
+            ))
+            for source in source_list if source not in redis_hits
+        ]
+
+        try:
+            for completed in asyncio.as_completed([labeled(source, task) for source, task in tasks]):
+                source, search_results = await completed
+                search_results = search_results if search_results else []
+                logger.info(f"{source.value} search completed: {len(search_results)} results")
+                yield source, search_results
+        finally:
+            # Structured cancellation: if the caller goes away mid-stream
+            # (client disconnect, cancelled request), stop the remaining
+            # upstream searches instead of letting them run to completion
+            for _, task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def iter_results(self, query: str, sources: List[SearchSource], max_results_per_source: int = 5):
+        """Yield individual SearchResults as sources complete.
+
+        Flattens search_parallel_stream so consumers (JSON-Lines responses,
+        downstream ranking/synthesis) can start on the first result without
+        holding the whole result set in memory.
+        """
+        async for _, source_results in self.search_parallel_stream(query, sources, max_results_per_source):
+            for result in source_results:
+                yield result
+
+    async def search_parallel(self, query: str, sources: List[SearchSource], max_results_per_source: int = 5) -> dict:
+        """Execute parallel searches across selected sources with timeout handling"""
+        results = {}
+
+        async for source, source_results in self.search_parallel_stream(query, sources, max_results_per_source):
+            results[source] = source_results
+
         return results
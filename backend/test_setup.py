@@ -1,9 +1,5 @@
 #!/usr/bin/env python3
 
-import sys
-import os
-sys.path.insert(0, '/Users/emredinc/projects/deep-search/backend/venv/lib/python3.13/site-packages')
-
 # Test imports
 try:
     from models import SearchSource, SearchResult
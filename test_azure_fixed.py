@@ -5,18 +5,15 @@ Local Azure OpenAI Connection Test with Fixed Parameters
 
 import os
 import asyncio
-import sys
 from pathlib import Path
 
-# Add the backend directory to the Python path
 backend_dir = Path(__file__).parent / "backend"
-sys.path.insert(0, str(backend_dir))
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
 load_dotenv(backend_dir / ".env")
 
-from openai import AsyncAzureOpenAI
+from azure_openai_client import get_client
 import logging
 
 # Configure logging
@@ -32,11 +29,8 @@ async def test_fixed_parameters():
     deployment_name = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
     api_version = os.getenv("AZURE_OPENAI_API_VERSION")
     
-    client = AsyncAzureOpenAI(
-        api_key=api_key,
-        api_version=api_version,
-        azure_endpoint=endpoint
-    )
+    # Shared module-level client: repeated runs reuse one connection pool
+    client = get_client()
     
     try:
         # Test basic connection with correct parameter
@@ -90,4 +84,10 @@ async def main():
         print("❌ RESULT: Still having issues even with fixed parameters.")
 
 if __name__ == "__main__":
+    # uvloop speeds up the async client I/O when available
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())
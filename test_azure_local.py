@@ -7,12 +7,9 @@ as the deployed application to isolate whether issues are with Render or Azure.
 
 import os
 import asyncio
-import sys
 from pathlib import Path
 
-# Add the backend directory to the Python path
 backend_dir = Path(__file__).parent / "backend"
-sys.path.insert(0, str(backend_dir))
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
@@ -124,37 +121,54 @@ Synthesis:"""
             self._analyze_error(e)
             return False
 
+    async def _probe_api_version(self, version):
+        """Probe one API version, returning (version, ok)"""
+        try:
+            logger.info(f"Testing API version: {version}")
+            test_client = AsyncAzureOpenAI(
+                api_key=self.api_key,
+                api_version=version,
+                azure_endpoint=self.endpoint
+            )
+
+            await asyncio.wait_for(
+                test_client.chat.completions.create(
+                    model=self.deployment_name,
+                    messages=[{"role": "user", "content": "Test"}],
+                    max_tokens=10
+                ),
+                timeout=10
+            )
+            return version, True
+
+        except Exception as e:
+            logger.info(f"❌ API version {version} failed: {str(e)[:100]}...")
+            return version, False
+
     async def test_different_api_versions(self):
         """Test different API versions to see if version is the issue"""
         logger.info("\n=== Testing Different API Versions ===")
         versions_to_test = [
             "2024-12-01-preview",
-            "2024-02-01", 
+            "2024-02-01",
             "2023-12-01-preview",
             "2023-05-15"
         ]
-        
-        for version in versions_to_test:
-            try:
-                logger.info(f"Testing API version: {version}")
-                test_client = AsyncAzureOpenAI(
-                    api_key=self.api_key,
-                    api_version=version,
-                    azure_endpoint=self.endpoint
-                )
-                
-                response = await test_client.chat.completions.create(
-                    model=self.deployment_name,
-                    messages=[{"role": "user", "content": "Test"}],
-                    max_tokens=10
-                )
-                
+
+        # Probe all versions concurrently; wall time is max(RTT), not sum
+        outcomes = await asyncio.gather(
+            *(self._probe_api_version(v) for v in versions_to_test),
+            return_exceptions=True
+        )
+
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                continue
+            version, ok = outcome
+            if ok:
                 logger.info(f"✅ API version {version} works!")
                 return version
-                
-            except Exception as e:
-                logger.info(f"❌ API version {version} failed: {str(e)[:100]}...")
-                
+
         logger.error("❌ No API versions worked")
         return None
 
@@ -229,4 +243,10 @@ async def main():
         print(f"\n❌ TEST SETUP FAILED: {e}")
 
 if __name__ == "__main__":
+    # uvloop speeds up the async client I/O when available
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())
@@ -5,18 +5,15 @@ Test Azure OpenAI with Exact Same Parameters as Debug Endpoint
 
 import os
 import asyncio
-import sys
 from pathlib import Path
 
-# Add the backend directory to the Python path
 backend_dir = Path(__file__).parent / "backend"
-sys.path.insert(0, str(backend_dir))
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
 load_dotenv(backend_dir / ".env")
 
-from openai import AsyncAzureOpenAI
+from azure_openai_client import get_client
 import logging
 
 # Configure logging
@@ -35,11 +32,8 @@ async def test_synthesis_exact():
     logger.info(f"API Key length: {len(api_key) if api_key else 0}")
     logger.info(f"API Key preview: {api_key[:10]}...{api_key[-10:] if api_key and len(api_key) > 20 else 'N/A'}")
     
-    client = AsyncAzureOpenAI(
-        api_key=api_key,
-        api_version=api_version,
-        azure_endpoint=endpoint
-    )
+    # Shared module-level client: repeated runs reuse one connection pool
+    client = get_client()
     
     # Create test results that match the debug endpoint structure
     from models import SearchSource, SearchResult
@@ -58,38 +52,28 @@ async def test_synthesis_exact():
     try:
         # Mimic the exact synthesis call from azure_openai_client.py
         logger.info("Creating synthesis with exact backend logic...")
-        
-        # Format results like the backend does
-        formatted_results = []
+
+        # Format results like the backend does: one StringIO pass, no
+        # intermediate list plus join
+        import io
+        buf = io.StringIO()
         for source, source_results in test_results.items():
             if source_results:
-                formatted_results.append(f"\n{source.value.upper()} RESULTS:")
+                buf.write(f"\n{source.value.upper()} RESULTS:\n")
                 for i, result in enumerate(source_results[:3], 1):
-                    formatted_results.append(f"{i}. {result.title}")
-                    formatted_results.append(f"   {result.snippet}")
-                    formatted_results.append(f"   Source: {result.url}")
-        
-        system_prompt = """
-        You are an expert research assistant. Your task is to analyze and synthesize information from multiple search sources to provide a comprehensive, well-structured response to the user's query.
+                    buf.write(f"{i}. {result.title}\n   {result.snippet}\n   Source: {result.url}\n")
+
+        # Reuse the backend's frozen system prompt rather than re-building a
+        # drifting copy here
+        from azure_openai_client import SYNTHESIS_SYSTEM_PROMPT
+        system_prompt = SYNTHESIS_SYSTEM_PROMPT
 
-        Guidelines:
-        1. Provide a clear, comprehensive answer based on the search results
-        2. Cite sources when making specific claims
-        3. Identify patterns and connections across different sources
-        4. Highlight any conflicting information found
-        5. Structure your response with clear sections if appropriate
-        6. Be objective and factual
-        7. If information is limited, acknowledge the limitations
-        
-        Format your response in a clear, readable manner with proper sections and bullet points where appropriate.
-        """
-        
         user_prompt = f"""
         Query: test query
-        
+
         Search Results from Multiple Sources:
-        {chr(10).join(formatted_results)}
-        
+        {buf.getvalue()}
+
         Please analyze and synthesize this information to provide a comprehensive answer to the query. Include insights from the different sources and identify key themes or patterns.
         """
         
@@ -133,4 +117,10 @@ async def main():
         print("   This suggests there might be another issue.")
 
 if __name__ == "__main__":
+    # uvloop speeds up the async client I/O when available
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())